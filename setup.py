@@ -1,7 +1,9 @@
 import unittest
 import os
-from setuptools import setup
+from setuptools import setup, Extension
+from setuptools.command.build_ext import build_ext
 from distutils.core import Command
+from distutils.errors import CCompilerError, DistutilsExecError, DistutilsPlatformError
 
 from versionedobj import __version__
 
@@ -22,6 +24,34 @@ class RunVersionedObjTests(Command):
         t = unittest.TextTestRunner(verbosity = 2)
         t.run(suite)
 
+class OptionalBuildExt(build_ext):
+    """
+    Builds the optional compiled extension modules, without failing the install
+    if they cannot be built (versionedobj falls back to pure python)
+    """
+    def run(self):
+        try:
+            build_ext.run(self)
+        except DistutilsPlatformError as e:
+            print(f"Skipping compiled extensions: {e}")
+
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except (CCompilerError, DistutilsExecError, DistutilsPlatformError) as e:
+            print(f"Skipping compiled extension {ext.name}: {e}")
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    # Without Cython, build the extension from the generated C file, if one was shipped in the sdist
+    if os.path.isfile(os.path.join(HERE, 'versionedobj', '_walk_c.c')):
+        ext_modules = [Extension('versionedobj._walk_c', ['versionedobj/_walk_c.c'])]
+    else:
+        ext_modules = []
+else:
+    ext_modules = cythonize([Extension('versionedobj._walk_c', ['versionedobj/_walk_c.pyx'])])
+
 with open(README, 'r') as f:
     long_description = f.read()
 
@@ -35,7 +65,9 @@ setup(
     author_email='eknyquist@gmail.com',
     license='Apache 2.0',
     packages=['versionedobj'],
-    cmdclass={'test': RunVersionedObjTests},
+    extras_require={'orjson': ['orjson']},
+    ext_modules=ext_modules,
+    cmdclass={'test': RunVersionedObjTests, 'build_ext': OptionalBuildExt},
     include_package_data=True,
     zip_safe=False,
     python_requires=">=3.7",
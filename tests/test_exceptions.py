@@ -254,3 +254,134 @@ class TestVersionedObjectExceptions(TestCase):
             var2 = NestedConfig2
 
         self.assertRaises(InvalidVersionAttributeError, TestConfig1)
+
+    def test_nested_version_exception_added_later(self):
+        """
+        Tests that expected exception is raised when a 'version' attribute is added
+        to a nested object class after the containing class was instantiated
+        """
+        class NestedConfig(VersionedObject):
+            var1 = "hey"
+
+        class TestConfig1(VersionedObject):
+            var1 = 1
+            var2 = NestedConfig
+
+        TestConfig1()
+        NestedConfig.version = "1"
+
+        self.assertRaises(InvalidVersionAttributeError, TestConfig1)
+
+    def test_load_dict_validation_failure_leaves_object_unchanged(self):
+        """
+        Tests that no fields are loaded into the object when validation of the
+        dict fails partway through
+        """
+        class NestedConfig(VersionedObject):
+            var1 = "hey"
+            var2 = 8.8
+
+        class TestConfig(VersionedObject):
+            var1 = 1
+            var2 = NestedConfig()
+
+        ser = Serializer()
+        cfg = TestConfig()
+        bad_config = {'var1': 99, 'var2': {'var1': "changed"}}
+
+        self.assertRaises(InputValidationError, ser.from_dict, bad_config, cfg)
+        self.assertEqual(1, cfg.var1)
+        self.assertEqual("hey", cfg.var2.var1)
+        self.assertEqual(8.8, cfg.var2.var2)
+
+    def test_validate_dict_reports_all_missing_fields(self):
+        """
+        Tests that validate_dict lists all missing attribute names in the exception
+        message, and does not report fields excluded by filters
+        """
+        class NestedConfig(VersionedObject):
+            var1 = "hey"
+            var2 = 8.8
+
+        class TestConfig(VersionedObject):
+            version = "1.0.0"
+            var1 = 1
+            var2 = NestedConfig()
+            var3 = 3
+
+        ser = Serializer()
+        cfg = TestConfig()
+
+        with self.assertRaises(InputValidationError) as ctx:
+            ser.validate_dict({'var3': 3, 'var2': {'var1': "hey"}}, cfg)
+
+        self.assertEqual("Attributes missing from dict: var1,var2.var2", str(ctx.exception))
+
+        with self.assertRaises(InputValidationError) as ctx:
+            ser.validate_dict({'var3': 3}, cfg, ignore=['var1'])
+
+        self.assertEqual("Attributes missing from dict: var2.var1,var2.var2", str(ctx.exception))
+
+    def test_initial_values_invalid_attr(self):
+        """
+        Tests that the expected exception is raised when the 'initial_values' parameter
+        for the VersionedObject constructor contains an unrecognized attribute name
+        """
+        class NestedConfig(VersionedObject):
+            var1 = "hello"
+
+        class TestConfig(VersionedObject):
+            var1 = 4
+            var2 = NestedConfig()
+
+        self.assertRaises(InputValidationError, TestConfig, {'var1': 5, 'var2.var2': 6})
+        self.assertRaises(InputValidationError, TestConfig, {'var2': 6})
+
+    def test_load_dict_no_validation_invalid_attr(self):
+        """
+        Tests that the expected exception is raised when a dict loaded without
+        validation contains an unrecognized attribute name
+        """
+        class NestedConfig(VersionedObject):
+            var1 = "hello"
+
+        class TestConfig(VersionedObject):
+            var1 = 4
+            var2 = NestedConfig()
+
+        ser = Serializer()
+        cfg = TestConfig()
+
+        with self.assertRaises(AttributeError) as ctx:
+            ser.from_dict({'var1': 5, 'var2': 6}, cfg, validate=False)
+
+        self.assertEqual("Unrecognized attribute name 'var2' in dict", str(ctx.exception))
+
+        with self.assertRaises(AttributeError) as ctx:
+            ser.from_dict({'var1': 5, 'var2': {'var2': 6}}, cfg, validate=False)
+
+        self.assertEqual("Unrecognized attribute name 'var2.var2' in dict", str(ctx.exception))
+
+    def test_load_dict_version_without_version_field(self):
+        """
+        Tests that a 'version' key in a dict is reported as an unrecognized attribute
+        name, when the object has no version field
+        """
+        class TestConfig(VersionedObject):
+            var1 = 4
+
+        class VersionedTestConfig(VersionedObject):
+            version = "1.0.0"
+            var1 = 4
+
+        ser = Serializer()
+        cfg = TestConfig()
+
+        self.assertRaises(InputValidationError, ser.validate_dict, {'var1': 5, 'version': "9"}, cfg)
+        self.assertRaises(InputValidationError, ser.from_dict, {'var1': 5, 'version': None}, cfg)
+        self.assertEqual(4, cfg.var1)
+        self.assertRaises(AttributeError, ser.from_dict, {'var1': 5, 'version': None}, cfg, validate=False)
+
+        vcfg = VersionedTestConfig()
+        ser.from_dict({'var1': 5, 'version': "1.0.0"}, vcfg)
+        self.assertEqual(5, vcfg.var1)
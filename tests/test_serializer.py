@@ -1,7 +1,7 @@
 import os
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from versionedobj import (VersionedObject, FileLoader, LoadObjectError, InvalidFilterError, Serializer, CustomValue, migration, ListField)
+from versionedobj import (VersionedObject, FileLoader, LoadObjectError, InvalidFilterError, InputValidationError, Serializer, CustomValue, migration, ListField)
 
 
 class TestVersionedObjectSerializer(TestCase):
@@ -93,6 +93,42 @@ class TestVersionedObjectSerializer(TestCase):
         self.assertEqual([2, 3, 4], cfg.val4)
         self.assertEqual({"a": 5, "b": 55.5}, cfg.val5)
 
+    def test_basic_config_json_bytes(self):
+        """
+        Tests that a VersionedObject instance can be deserialized from a JSON string
+        encoded as bytes
+        """
+        class TestConfig(VersionedObject):
+            val1 = 1
+            val2 = "howdy"
+
+        s = Serializer()
+        cfg = TestConfig()
+        result = s.from_json('{"val1": 5, "val2": "h\u00e9llo"}'.encode('utf-8'), cfg)
+        self.assertIs(None, result) # verify no migrations peformewd
+
+        self.assertEqual(5, cfg.val1)
+        self.assertEqual("h\u00e9llo", cfg.val2)
+
+    def test_basic_config_json_bytes_invalid_utf8(self):
+        """
+        Tests that LoadObjectError is raised when a JSON string encoded as bytes
+        is not valid UTF-8
+        """
+        class TestConfig(VersionedObject):
+            val1 = 1
+
+        s = Serializer()
+        cfg = TestConfig()
+        self.assertRaises(LoadObjectError, s.from_json, b'\x80\x81', cfg)
+        self.assertRaises(LoadObjectError, s.from_json, b'{"val1": "\xff"}', cfg)
+
+        with mock.patch('versionedobj.serializer._HAS_ORJSON', False):
+            self.assertRaises(LoadObjectError, s.from_json, b'\x80\x81', cfg)
+            self.assertRaises(LoadObjectError, s.from_json, b'{"val1": "\xff"}', cfg)
+
+        self.assertEqual(1, cfg.val1)
+
     def test_basic_config_file(self):
         """
         Tests that a VersionedObject instance still contains the same values after
@@ -1919,3 +1955,237 @@ class TestVersionedObjectSerializer(TestCase):
         config2 = TestConfig()
         self.assertEqual(len(config.var1), 1)
         self.assertEqual(len(config2.var1), 0)
+
+    def test_file_values_not_supported_by_orjson(self):
+        """
+        Tests that values which orjson cannot encode or decode are still saved to,
+        and loaded from a JSON file correctly
+        """
+        class TestConfig(VersionedObject):
+            var1 = 2 ** 70 + 1
+            var2 = float('inf')
+            var3 = "héllo"
+            var4 = -(2 ** 63) - 1
+
+        cfg = TestConfig()
+        ser = Serializer(cfg)
+        filename = "__test_file.json"
+
+        for indent in (None, 2, 4):
+            ser.to_file(filename, indent=indent)
+            cfg2 = TestConfig()
+            ser.from_file(filename, cfg2)
+
+            self.assertEqual(cfg, cfg2)
+            self.assertIs(int, type(cfg2.var1))
+            self.assertEqual(2 ** 70 + 1, cfg2.var1)
+            self.assertIs(int, type(cfg2.var4))
+            self.assertEqual(-(2 ** 63) - 1, cfg2.var4)
+
+        os.remove(filename)
+
+    def test_file_without_orjson(self):
+        """
+        Tests that object data can be saved to, and loaded from a JSON file when
+        orjson is not available
+        """
+        class NestedConfig(VersionedObject):
+            var1 = "abc"
+
+        class TestConfig(VersionedObject):
+            var1 = 1
+            var2 = NestedConfig
+
+        cfg = TestConfig()
+        cfg.var2.var1 = "def"
+        ser = Serializer(cfg)
+        filename = "__test_file.json"
+
+        with mock.patch('versionedobj.serializer._HAS_ORJSON', False):
+            ser.to_file(filename, indent=4)
+            cfg2 = TestConfig()
+            ser.from_file(filename, cfg2)
+
+        self.assertEqual("def", cfg2.var2.var1)
+        os.remove(filename)
+
+    def test_dict_migrations_added_out_of_order(self):
+        """
+        Tests that from_dict can successfully migrate an object through multiple
+        versions, when the migrations were not added in version order
+        """
+        class TestConfig(VersionedObject):
+            version = "1.0.2"
+            var1 = 1
+            var2 = 2
+            var3 = 3
+
+        fake_config = {'var1': 11}
+
+        @migration(TestConfig, "1.0.1", "1.0.2")
+        def migrate_101_to_102(attrs):
+            attrs['var3'] = 13
+            return attrs
+
+        @migration(TestConfig, "1.0.0", "1.0.1")
+        def migrate_100_to_101(attrs):
+            attrs['var2'] = 12
+            return attrs
+
+        @migration(TestConfig, None, "1.0.0")
+        def migrate_none_to_100(attrs):
+            attrs['var1'] += 100
+            return attrs
+
+        ser = Serializer()
+        cfg = TestConfig()
+        result = ser.from_dict(fake_config, cfg)
+
+        self.assertEqual(111, cfg.var1)
+        self.assertEqual(12, cfg.var2)
+        self.assertEqual(13, cfg.var3)
+
+        self.assertEqual(True, result.success)
+        self.assertEqual("1.0.2", result.version_reached)
+
+    def test_version_field_dict(self):
+        """
+        Tests that the version field is in declaration order in the dict produced
+        by to_dict, and that from_dict does not modify the dict it is given
+        """
+        class TestConfig(VersionedObject):
+            var1 = 1
+            version = "1.0.0"
+            var2 = 2
+
+        ser = Serializer()
+        cfg = TestConfig()
+
+        d = ser.to_dict(cfg)
+        self.assertEqual(['var1', 'version', 'var2'], list(d))
+        self.assertEqual(['var1', 'version'], list(ser.to_dict(cfg, ignore=['var2'])))
+        self.assertEqual('{"var1": 1, "version": "1.0.0", "var2": 2}', ser.to_json(cfg))
+        self.assertEqual(['var1', 'var2'], list(ser.to_dict(cfg, ignore=['version'])))
+        self.assertEqual(['version'], list(ser.to_dict(cfg, only=['version'])))
+
+        d['var1'] = 11
+        ser.from_dict(d, cfg)
+        self.assertEqual({'version': "1.0.0", 'var1': 11, 'var2': 2}, d)
+        self.assertEqual(11, cfg.var1)
+        self.assertEqual("1.0.0", cfg.version)
+        self.assertEqual(['var1', 'version', 'var2'], list(cfg))
+        self.assertEqual(3, len(cfg))
+
+    def test_filters_as_tuples(self):
+        """
+        Tests that 'only' and 'ignore' filters can be passed as any iterable of names
+        """
+        class TestConfig(VersionedObject):
+            var1 = 1
+            var2 = 2
+            var3 = 3
+
+        ser = Serializer(TestConfig())
+        self.assertEqual({'var2': 2}, ser.to_dict(only=('var2',)))
+        self.assertEqual({'var1': 1, 'var3': 3}, ser.to_dict(ignore=('var2',)))
+        self.assertEqual({'var1': 1, 'var2': 2, 'var3': 3}, ser.to_dict(only=None, ignore=None))
+
+    def test_field_names_not_valid_identifiers(self):
+        """
+        Tests that fields with names that are not valid python identifiers can be
+        serialized and deserialized
+        """
+        class NestedConfig(VersionedObject):
+            var1 = 1
+
+        class TestConfig(VersionedObject):
+            var1 = 2
+            var2 = NestedConfig
+
+        setattr(TestConfig, 'var-3', 3)
+        setattr(NestedConfig, 'class', 4)
+
+        ser = Serializer()
+        cfg = TestConfig()
+
+        d = ser.to_dict(cfg)
+        self.assertEqual({'var1': 2, 'var-3': 3, 'var2': {'var1': 1, 'class': 4}}, d)
+
+        d['var-3'] = 33
+        d['var2']['class'] = 44
+        ser.from_dict(d, cfg)
+        self.assertEqual(33, cfg['var-3'])
+        self.assertEqual(44, cfg['var2.class'])
+
+    def test_field_names_changed_by_normalization(self):
+        """
+        Tests that fields with names that are changed by unicode normalization are
+        not confused with the fields matching the normalized names
+        """
+        class TestConfig(VersionedObject):
+            pass
+
+        setattr(TestConfig, '\ufb01eld', 1)
+        setattr(TestConfig, 'field', 2)
+
+        ser = Serializer()
+        cfg = TestConfig()
+        self.assertEqual({'\ufb01eld': 1, 'field': 2}, ser.to_dict(cfg))
+
+        ser.from_dict({'\ufb01eld': 9, 'field': 8}, cfg)
+        self.assertEqual(9, cfg['\ufb01eld'])
+        self.assertEqual(8, cfg.field)
+
+    def test_dict_layout_change_after_serialization(self):
+        """
+        Tests that adding fields to a class after an instance has already been
+        serialized and deserialized is reflected by to_dict and from_dict
+        """
+        class NestedConfig(VersionedObject):
+            var1 = 1
+
+        class TestConfig(VersionedObject):
+            version = "1.0.0"
+            var1 = 2
+            var2 = NestedConfig
+
+        ser = Serializer()
+        cfg = TestConfig()
+        ser.from_dict({'version': "1.0.0", 'var1': 22, 'var2': {'var1': 11}}, cfg)
+        self.assertEqual({'version': "1.0.0", 'var1': 22, 'var2': {'var1': 11}}, ser.to_dict(cfg))
+
+        NestedConfig.var2 = 3
+        cfg = TestConfig()
+        self.assertRaises(InputValidationError, ser.from_dict, {'version': "1.0.0", 'var1': 22, 'var2': {'var1': 11}}, cfg)
+
+        ser.from_dict({'version': "1.0.0", 'var1': 22, 'var2': {'var1': 11, 'var2': 33}}, cfg)
+        self.assertEqual({'version': "1.0.0", 'var1': 22, 'var2': {'var1': 11, 'var2': 33}}, ser.to_dict(cfg))
+
+    def test_dict_generic_serialization(self):
+        """
+        Tests that classes too large for generated serialization code are serialized
+        and deserialized the same way
+        """
+        class NestedConfig(VersionedObject):
+            var1 = 1
+            var2 = 2
+
+        class TestConfig(VersionedObject):
+            version = "1.0.0"
+            var1 = 3
+            var2 = NestedConfig
+            var3 = 4
+
+        ser = Serializer()
+        expected = {'version': "1.0.0", 'var1': 3, 'var3': 4, 'var2': {'var1': 1, 'var2': 2}}
+
+        with mock.patch('versionedobj.utils._CODEGEN_MAX_FIELDS', 0):
+            cfg = TestConfig()
+            d = ser.to_dict(cfg)
+            self.assertEqual(expected, d)
+            self.assertEqual(list(expected), list(d))
+
+            d['var2']['var2'] = 22
+            ser.from_dict(d, cfg)
+            self.assertEqual(22, cfg.var2.var2)
+            self.assertRaises(InputValidationError, ser.from_dict, {'version': "1.0.0", 'var1': 3}, cfg)
@@ -1,5 +1,5 @@
 import os
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from versionedobj import (VersionedObject, LoadObjectError, InvalidFilterError, Serializer, CustomValue, migration)
 
@@ -878,3 +878,116 @@ class TestVersionedObject(TestCase):
         cfg2 = TestConfig2()
         self.assertEqual(7, len(cfg1))
         self.assertEqual(5, len(cfg2))
+
+    def test_class_layout_change_after_serialization(self):
+        """
+        Tests that adding fields to a class (including to a nested object class)
+        after an instance has already been serialized is reflected by new instances
+        """
+        class NestedConfig(VersionedObject):
+            var1 = 1
+
+        class TestConfig(VersionedObject):
+            var1 = 2
+            var2 = NestedConfig
+
+        ser = Serializer()
+        self.assertEqual({'var1': 2, 'var2': {'var1': 1}}, ser.to_dict(TestConfig()))
+
+        NestedConfig.var2 = 3
+        TestConfig.var3 = 4
+
+        cfg = TestConfig()
+        self.assertEqual({'var1': 2, 'var3': 4, 'var2': {'var1': 1, 'var2': 3}}, ser.to_dict(cfg))
+        self.assertEqual(['var1', 'var3', 'var2.var1', 'var2.var2'], list(cfg))
+
+        del TestConfig.var3
+
+        self.assertEqual(['var1', 'var2.var1', 'var2.var2'], list(TestConfig()))
+
+    def _check_instance_layout_change_serialization(self):
+        class NestedConfig(VersionedObject):
+            var1 = 1
+
+        class TestConfig(VersionedObject):
+            var1 = 2
+            var2 = NestedConfig
+            var3 = None
+
+        ser = Serializer()
+
+        cfg = TestConfig()
+        cfg.var4 = 4
+        cfg.var2.var2 = 3
+        self.assertEqual({'var1': 2, 'var3': None, 'var4': 4, 'var2': {'var1': 1, 'var2': 3}}, ser.to_dict(cfg))
+        self.assertEqual({'var4': 4}, ser.to_dict(cfg, only=['var4']))
+        self.assertNotEqual(cfg, TestConfig())
+
+        cfg = TestConfig()
+        del cfg.var1
+        self.assertEqual({'var3': None, 'var2': {'var1': 1}}, ser.to_dict(cfg))
+        self.assertEqual({}, ser.to_dict(cfg, only=['var1']))
+
+        cfg = TestConfig()
+        del cfg.var2.var1
+        cfg.var2.var5 = 5
+        self.assertEqual({'var1': 2, 'var3': None, 'var2': {'var5': 5}}, ser.to_dict(cfg))
+
+        cfg = TestConfig()
+        cfg.var3 = NestedConfig()
+        self.assertEqual({'var1': 2, 'var2': {'var1': 1}, 'var3': {'var1': 1}}, ser.to_dict(cfg))
+        self.assertEqual({'var3': {'var1': 1}}, ser.to_dict(cfg, only=['var3.var1']))
+
+        cfg = TestConfig()
+        cfg.var2 = 5
+        self.assertEqual({'var1': 2, 'var2': 5, 'var3': None}, ser.to_dict(cfg))
+        self.assertEqual('{"var1": 2, "var2": 5, "var3": null}', ser.to_json(cfg))
+
+        # Unchanged instances still serialize the same way
+        self.assertEqual({'var1': 2, 'var3': None, 'var2': {'var1': 1}}, ser.to_dict(TestConfig()))
+        self.assertEqual({'var2': {'var1': 1}}, ser.to_dict(TestConfig(), only=['var2']))
+
+    def test_instance_layout_change_serialization(self):
+        """
+        Tests that fields added to or removed from an instance (including nested
+        object instances) are reflected when the instance is serialized
+        """
+        self._check_instance_layout_change_serialization()
+
+    def test_instance_layout_change_serialization_generic(self):
+        """
+        Tests that fields added to or removed from an instance (including nested
+        object instances) are reflected when the instance is serialized, for classes
+        too large for generated serialization code
+        """
+        with mock.patch('versionedobj.utils._CODEGEN_MAX_FIELDS', 0):
+            self._check_instance_layout_change_serialization()
+
+    def test_instance_layout_change_contains_iter(self):
+        """
+        Tests that fields added to or removed from an instance (including nested
+        object instances) are reflected by 'in' and by iterating over the instance
+        """
+        class NestedConfig(VersionedObject):
+            var1 = 1
+
+        class TestConfig(VersionedObject):
+            var1 = 2
+            var2 = NestedConfig
+
+        cfg = TestConfig()
+        cfg.var2 = 5
+        self.assertTrue(5 in cfg)
+        self.assertFalse(1 in cfg)
+        self.assertEqual(['var1', 'var2'], list(cfg))
+
+        cfg = TestConfig()
+        cfg.var3 = 3
+        del cfg.var2.var1
+        self.assertTrue(3 in cfg)
+        self.assertFalse(1 in cfg)
+        self.assertEqual(['var1', 'var3'], list(cfg))
+
+        cfg = TestConfig()
+        self.assertTrue(1 in cfg)
+        self.assertEqual(['var1', 'var2.var1'], list(cfg))
@@ -0,0 +1,52 @@
+# cython: language_level=3
+"""
+Compiled versions of the object traversal functions in versionedobj.utils. This
+module is optional, versionedobj.utils falls back to the pure-python versions if
+it has not been built.
+"""
+
+from versionedobj.utils import _PLAIN_TYPES, _convert_value
+
+
+cpdef dict schema_to_dict(object schema, object obj, dict ret):
+    """
+    Serialize the fields described by a sequence of schema entries to a dict
+
+    :param schema: sequence of schema entries for the fields to serialize
+    :param obj: Versioned object to convert to dict
+    :param dict ret: dict to add fields to
+
+    :return: object data as a dict
+    """
+    cdef dict parent_dicts = {(): ret}
+    cdef dict attrs
+    cdef tuple entry
+    cdef tuple parents
+    cdef object value
+    cdef object child
+    cdef object pname
+
+    for entry in schema:
+        value = entry[3](obj)
+        if type(value) not in _PLAIN_TYPES:
+            value = _convert_value(value)
+
+        parents = <tuple>entry[0]
+        child = parent_dicts.get(parents)
+        if child is None:
+            attrs = ret
+            for pname in parents:
+                child = attrs.get(pname)
+                if child is None:
+                    child = {}
+                    attrs[pname] = child
+
+                attrs = <dict>child
+
+            parent_dicts[parents] = attrs
+        else:
+            attrs = <dict>child
+
+        attrs[entry[1]] = value
+
+    return ret
@@ -1,10 +1,12 @@
 import json
 import copy
 import sys
-import inspect
 
+from versionedobj import utils
 from versionedobj.exceptions import InvalidVersionAttributeError, InputValidationError
-from versionedobj.utils import _ObjField, _iter_obj_attrs, _walk_obj_attrs, _obj_to_dict
+from versionedobj.utils import (_ObjField, _iter_obj_attrs, _walk_obj_attrs, _obj_to_dict, _get_obj_schema,
+                                _get_obj_fields, _nested_obj_class, _invalidate_obj_schemas,
+                                _obj_matches_schema)
 
 
 def add_migration(migration_func, cls, from_version, to_version):
@@ -25,7 +27,8 @@ def add_migration(migration_func, cls, from_version, to_version):
     except KeyError:
         raise ValueError("Cannot add migration to un-versioned object. Add a 'version' attribute.")
 
-    cls._vobj__migrations.append((from_version, to_version, migration_func))
+    # If more than one migration is added for the same 'from' version, the first one is used
+    cls._vobj__migrations_by_from.setdefault(from_version, (to_version, migration_func))
 
 
 def migration(cls, from_version, to_version):
@@ -46,6 +49,12 @@ def migration(cls, from_version, to_version):
     return _inner_migration
 
 
+# Kinds of instance attributes in VersionedObject._vobj__build_init_plan
+_INIT_VALUE = 0
+_INIT_COPY = 1
+_INIT_NESTED = 2
+
+
 class MigrationResult(object):
     """
     Value returned by Serializer.from_dict, Serializer.from_file, and Serializer.from_json methods,
@@ -57,6 +66,8 @@ class MigrationResult(object):
         match target_version after a successful migration)
     :ivar bool success: True if migration was successful, false otherwise
     """
+    __slots__ = ('old_version', 'target_version', 'version_reached', 'success')
+
     def __init__(self, old_version, target_version, version_reached, success):
         self.old_version = old_version
         self.target_version = target_version
@@ -89,12 +100,45 @@ class CustomValue(object):
 
 class __Meta(type):
     """
-    Metaclass for VersionedObject, creates the 'migrations' class attribute
+    Metaclass for VersionedObject, creates the migrations class attribute, and
+    the class attributes used for caching the object schema
     """
     def __new__(cls, name, bases, dic):
-        dic['_vobj__migrations'] = []
+        dic['_vobj__migrations_by_from'] = {}
+        dic['_vobj__fields'] = None
+        dic['_vobj__schema'] = None
+        dic['_vobj__version_slot'] = None
+        dic['_vobj__version_pos'] = None
+        dic['_vobj__schema_index'] = None
+        dic['_vobj__schema_nested'] = None
+        dic['_vobj__schema_levels'] = None
+        dic['_vobj__setters'] = None
+        dic['_vobj__schema_gen'] = -1
+        dic['_vobj__init_plan'] = None
+        dic['_vobj__to_dict'] = None
+        dic['_vobj__from_dict'] = None
         return super().__new__(cls, name, bases, dic)
 
+    def __setattr__(cls, name, value):
+        if not (name.startswith('__') or name.startswith('_vobj__')):
+            # Adding a new field, or adding/replacing a nested object, changes
+            # the layout of this class and of any class that contains it
+            if ((name not in cls.__dict__) or _nested_obj_class(value) or
+                    _nested_obj_class(cls.__dict__[name])):
+                _invalidate_obj_schemas()
+
+            # Default values are cached in the instance initialization plan
+            cls._vobj__init_plan = None
+
+        super().__setattr__(name, value)
+
+    def __delattr__(cls, name):
+        if not (name.startswith('__') or name.startswith('_vobj__')):
+            _invalidate_obj_schemas()
+            cls._vobj__init_plan = None
+
+        super().__delattr__(name)
+
 
 class VersionedObject(metaclass=__Meta):
     """
@@ -102,25 +146,40 @@ class VersionedObject(metaclass=__Meta):
     migrating older files to the current version
     """
 
-    def __init__(self, initial_values={}):
+    def __init__(self, initial_values=None):
         """
         :param dict: map of initial values. Keys are the field name, and values are\
             the initial values to set.
+
+        :raises versionedobj.exceptions.InputValidationError: if initial_values contains\
+            a name that is not a field of this object
         """
-        self._vobj__field_count = 0
         self._vobj__populate_instance()
 
         # Set alternate initial values, if any
         if initial_values:
-            for field in _walk_obj_attrs(self):
-                dotname = field.dot_name()
-                if dotname in initial_values:
-                    field.value = initial_values[dotname]
-                    field.set_obj_field(self)
+            _get_obj_schema(self.__class__)
+            setters = self.__class__._vobj__setters
+
+            for dotname, value in initial_values.items():
+                setter = setters.get(dotname, None)
+                if setter is None:
+                    raise InputValidationError(f"Unrecognized attribute name '{dotname}' in initial values")
+
+                setter(self, value)
 
     def __contains__(self, item):
-        for field in _walk_obj_attrs(self):
-            if field.get_obj_field(self) == item:
+        fields = _get_obj_fields(self.__class__)
+        if not _obj_matches_schema(self):
+            # Instance has different fields than its class, walk the instance instead
+            for field in _walk_obj_attrs(self):
+                if field.value == item:
+                    return True
+
+            return False
+
+        for _, _, _, getter, _ in fields:
+            if getter(self) == item:
                 return True
 
         return False
@@ -168,29 +227,46 @@ class VersionedObject(metaclass=__Meta):
         return hash(json.dumps(_obj_to_dict(self)))
 
     def __len__(self):
-        return self._vobj__field_count
+        return len(_get_obj_fields(self.__class__))
 
-    def _vobj__populate_instance(self):
-        for n in _iter_obj_attrs(self.__class__):
-            val = getattr(self.__class__, n)
-
-            vobj_class = None
-            if isinstance(val, VersionedObject):
-                vobj_class = val.__class__
-            elif inspect.isclass(val) and issubclass(val, VersionedObject):
-                vobj_class = val
-            elif isinstance(val, CustomValue):
-                val = copy.deepcopy(val)
+    @classmethod
+    def _vobj__build_init_plan(cls):
+        """
+        Build a list of (name, kind, value) tuples describing how to populate each
+        instance attribute, for each class attribute
+        """
+        plan = []
+        for n in _iter_obj_attrs(cls):
+            val = getattr(cls, n)
 
+            vobj_class = _nested_obj_class(val)
             if vobj_class:
                 if hasattr(val, 'version'):
                     raise InvalidVersionAttributeError(f"{vobj_class.__name__} cannot have a version attribute. "
                                                         "Only the top-level object can have a version attribute.")
 
-                val = vobj_class()
-                self._vobj__field_count += val._vobj__field_count
+                plan.append((n, _INIT_NESTED, vobj_class))
+            elif isinstance(val, CustomValue):
+                plan.append((n, _INIT_COPY, val))
             else:
-                self._vobj__field_count += 1
+                plan.append((n, _INIT_VALUE, val))
+
+        return tuple(plan)
+
+    def _vobj__populate_instance(self):
+        # The plan is rebuilt when the layout of any class changes, since a nested
+        # object class may have changed in a way that makes it invalid (e.g. gaining
+        # a version attribute)
+        cached = self.__class__._vobj__init_plan
+        if (cached is None) or (cached[0] != utils._schema_generation):
+            cached = (utils._schema_generation, self.__class__._vobj__build_init_plan())
+            self.__class__._vobj__init_plan = cached
+
+        for n, kind, val in cached[1]:
+            if kind == _INIT_NESTED:
+                val = val()
+            elif kind == _INIT_COPY:
+                val = copy.deepcopy(val)
 
             setattr(self, n, val)
 
@@ -205,14 +281,19 @@ class VersionedObject(metaclass=__Meta):
         if old_version != version:
             result = MigrationResult(old_version, version, None, True)
 
-            # Attempt migrations
-            for fromversion, toversion, migrate in cls._vobj__migrations:
-                if fromversion == current_version:
-                    attrs = migrate(attrs)
+            # Attempt migrations, following the chain of 'from' versions. Each
+            # migration can be used at most once, so a cycle cannot loop forever
+            migrations = cls._vobj__migrations_by_from
+            for _ in range(len(migrations)):
+                if current_version == version:
+                    break
+
+                hop = migrations.get(current_version, None)
+                if hop is None:
+                    break
 
-                    current_version = toversion
-                    if toversion == version:
-                        break
+                current_version, migrate = hop
+                attrs = migrate(attrs)
 
             if current_version != version:
                 result.success = False
@@ -222,7 +303,13 @@ class VersionedObject(metaclass=__Meta):
         return result, attrs
 
     def __getitem__(self, key):
+        schema = _get_obj_schema(self.__class__)
+        slot = self.__class__._vobj__schema_index.get(key, None)
+
         try:
+            if slot is not None:
+                return schema[slot][3](self)
+
             field = _ObjField.from_dot_name(key, self)
             val = field.get_obj_field(self)
         except AttributeError:
@@ -232,13 +319,27 @@ class VersionedObject(metaclass=__Meta):
         return val
 
     def __setitem__(self, key, value):
+        schema = _get_obj_schema(self.__class__)
+        slot = self.__class__._vobj__schema_index.get(key, None)
+        if slot is not None:
+            schema[slot][4](self, value)
+            return
+
         field = _ObjField.from_dot_name(key, self)
         field.value = value
         field.set_obj_field(self)
 
     def __iter__(self):
-        for field in _walk_obj_attrs(self):
-            yield field.dot_name()
+        fields = _get_obj_fields(self.__class__)
+        if not _obj_matches_schema(self):
+            # Instance has different fields than its class, walk the instance instead
+            for field in _walk_obj_attrs(self):
+                yield field.dot_name()
+
+            return
+
+        for _, _, dotname, _, _ in fields:
+            yield dotname
 
 _ObjField.set_obj_class(VersionedObject)
 
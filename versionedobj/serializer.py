@@ -1,38 +1,85 @@
 import os
+import re
 import inspect
 import json
+from collections import deque
 from json.decoder import JSONDecodeError
 
 from versionedobj.object import VersionedObject, CustomValue
-from versionedobj.utils import _ObjField, _walk_obj_attrs, _field_should_be_skipped, _obj_to_dict
-from versionedobj.exceptions import InvalidFilterError, LoadObjectError, InputValidationError, InvalidVersionAttributeError
+from versionedobj.utils import (_get_obj_schema, _filtered_obj_schema_slots, _normalize_filters, _obj_to_dict,
+                               _get_compiled_from_dict)
+from versionedobj.exceptions import LoadObjectError, InputValidationError, InvalidVersionAttributeError
 
+try:
+    import orjson
+except ImportError:
+    _HAS_ORJSON = False
+else:
+    _HAS_ORJSON = True
 
-def _walk_dict_attrs(obj, parent_attrs, only=[], ignore=[]):
+
+# orjson converts integers that do not fit in 64 bits to floats, so data containing a
+# run of 19 or more digits (which may be such an integer) is parsed by the json module
+_LONG_DIGITS_STR = re.compile(r'\d{19}')
+_LONG_DIGITS_BYTES = re.compile(rb'\d{19}')
+
+
+def _json_loads(data):
+    """
+    Parse a JSON string, using orjson if it is available
+
+    :param data: JSON data to parse, as str or bytes
+
+    :raises json.decoder.JSONDecodeError: if JSON parsing fails
+
+    :return: parsed data
+    """
+    if _HAS_ORJSON:
+        long_digits = _LONG_DIGITS_BYTES if isinstance(data, bytes) else _LONG_DIGITS_STR
+        if long_digits.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # orjson is stricter than the json module (e.g. NaN and Infinity are
+                # rejected), so let the json module decide
+                pass
+
+    return json.loads(data)
+
+
+def _walk_dict_attrs(obj, parent_attrs, only=(), ignore=()):
     """
     Walk all fields (including nested fields) in a versioned object as a dict, and
-    generate an _ObjField instance for each field
+    generate a (parents, fieldname, dotname, value) tuple for each field. Nested objects are identified
+    using the cached schema for the object class, so the object itself is not
+    accessed while walking.
 
+    :param obj: Versioned object instance the dict belongs to
     :param parent_attrs: Dict to walk
-    :param list only: List of 'only' names
-    :param list ignore: List of 'ignore' names
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
     """
-    attrs_stack = [(None, [], parent_attrs)]
+    _get_obj_schema(obj.__class__)
+    nested = obj.__class__._vobj__schema_nested
+    attrs_stack = deque([((), parent_attrs)])
 
     while attrs_stack:
-        fieldname, parents, attrs = attrs_stack.pop(0)
+        parents, attrs = attrs_stack.popleft()
 
         for n in attrs:
-            p = parents if fieldname is None else parents + [fieldname]
             value = attrs[n]
-            field = _ObjField(p, n, value)
-            field_value = field.get_obj_field(obj)
+            dotname = '.'.join(parents + (n,))
 
-            if (isinstance(field_value, VersionedObject) and (type(value) == dict)):
-                attrs_stack.append((n, p, value))
+            if (dotname in nested) and (type(value) == dict):
+                attrs_stack.append((parents + (n,), value))
             else:
-                if not _field_should_be_skipped(field.dot_name(), only, ignore):
-                    yield field
+                if only and not dotname.startswith(only):
+                    continue
+
+                if ignore and dotname.startswith(ignore):
+                    continue
+
+                yield parents, n, dotname, value
 
 
 class Serializer(object):
@@ -42,7 +89,7 @@ class Serializer(object):
     def __init__(self, obj=None):
         self.obj = obj
 
-    def to_dict(self, obj=None, only=[], ignore=[]):
+    def to_dict(self, obj=None, only=None, ignore=None):
         """
         Convert object to a dict, suitable for passing to the json library
 
@@ -53,9 +100,10 @@ class Serializer(object):
         :return: object data as a dict
         :rtype: dict
         """
+        only, ignore = _normalize_filters(only, ignore)
         return _obj_to_dict(obj if obj is not None else self.obj, only, ignore)
 
-    def validate_dict(self, attrs, obj=None, only=[], ignore=[]):
+    def validate_dict(self, attrs, obj=None, only=None, ignore=None):
         """
         Validate a versioned object in dict form.
 
@@ -71,46 +119,68 @@ class Serializer(object):
 
         :raises versionedobj.exceptions.InvalidFilterError: if both 'only' and 'ignore' are provided.
         """
-        if only and ignore:
-            raise InvalidFilterError("Cannot use both 'only' and 'ignore'")
-
+        only, ignore = _normalize_filters(only, ignore)
         obj = obj if obj is not None else self.obj
+        self._from_dict_validated(obj, attrs, only, ignore)
 
-        # Create a map of all object attribute names, to track which attributes have
-        # also been seen in the dict
-        obj_attrs_loaded = {}
-        for field in _walk_obj_attrs(obj, only, ignore):
-            dotname = field.dot_name()
-            if 'version' == dotname:
-                continue
+    def _from_dict_validated(self, obj, attrs, only, ignore):
+        """
+        Validate a versioned object in dict form, in a single walk through the dict.
 
-            obj_attrs_loaded[dotname] = False
+        :param obj: VersionedObject instance to validate the dict against
+        :param dict attrs: dict to validate
+        :param tuple only: Whitelist of attribute names to validate
+        :param tuple ignore: Blacklist of attribute names to exclude from validation
 
-        # Now, walk through all attributes in the dict
-        try:
-            for field in _walk_dict_attrs(obj, attrs, only, ignore):
-                dotname = field.dot_name()
+        :raises versionedobj.exceptions.InputValidationError: if the dict contains\
+            fields that are not found in this object, or if the dict is missing\
+            fields that are found in this object.
+
+        :return: list of (parents, fieldname, dotname, value) tuples for all validated fields in the dict
+        """
+        schema = _get_obj_schema(obj.__class__)
+        schema_index = obj.__class__._vobj__schema_index
+
+        # One slot per schema entry, to track which fields have been seen in the dict.
+        # Slots for fields excluded by filters start out set, since those fields are
+        # not required
+        slots = _filtered_obj_schema_slots(obj.__class__, only, ignore)
+        if slots is None:
+            loaded = bytearray(len(schema))
+        else:
+            loaded = bytearray(b'\x01') * len(schema)
+            for slot in slots:
+                loaded[slot] = 0
+
+        fields = []
+
+        for field in _walk_dict_attrs(obj, attrs, only, ignore):
+            dotname = field[2]
 
-                if 'version' == dotname:
+            slot = schema_index.get(dotname, None)
+            if slot is None:
+                if ('version' == dotname) and (obj.__class__._vobj__version_slot is not None):
+                    # Version is not part of the schema, it is handled by migration
                     continue
 
-                if dotname not in obj_attrs_loaded:
-                    raise InputValidationError(f"Unrecognized attribute name '{dotname}' in dict")
+                raise InputValidationError(f"Unrecognized attribute name '{dotname}' in dict")
 
-                obj_attrs_loaded[dotname] = True
-        except AttributeError as e:
-            raise InputValidationError(str(e))
+            loaded[slot] = 1
+            fields.append(field)
 
         # See if any fields were missing from the dict
         missing = []
-        for n in obj_attrs_loaded:
-            if not obj_attrs_loaded[n]:
-                missing.append(n)
+        slot = loaded.find(0)
+        while slot != -1:
+            missing.append(schema[slot][2])
+            slot = loaded.find(0, slot + 1)
 
         if missing:
             raise InputValidationError(f"Attributes missing from dict: {','.join(missing)}")
 
-    def from_dict(self, attrs, obj=None, validate=True, only=[], ignore=[]):
+        return fields
+
+    def from_dict(self, attrs, obj=None, validate=True, only=None, ignore=None):
         """
         Populate instance attributes of a VersionedObjbect instance, with object data from a dict.
 
@@ -130,9 +200,7 @@ class Serializer(object):
             None if no object migrations were required
         :rtype: MigrationResult
         """
-        if only and ignore:
-            raise InvalidFilterError("Cannot use both 'only' and 'ignore'")
-
+        only, ignore = _normalize_filters(only, ignore)
         obj = obj if obj is not None else self.obj
 
         version = obj.__dict__.get('version', None)
@@ -140,23 +208,38 @@ class Serializer(object):
         if (migration_result is not None) and (not migration_result.success):
             return migration_result
 
+        if validate and not (only or ignore):
+            # Fast path, for complete dicts with no filtering
+            from_dict = _get_compiled_from_dict(obj.__class__)
+            if (from_dict is not None) and from_dict(obj, attrs):
+                return migration_result
+
         if validate:
-            self.validate_dict(attrs, obj, only, ignore)
+            fields = self._from_dict_validated(obj, attrs, only, ignore)
+        else:
+            fields = _walk_dict_attrs(obj, attrs, only, ignore)
 
-        # Delete version field from dict, if it exists
-        if 'version' in attrs:
-            del attrs['version']
+        schema = _get_obj_schema(obj.__class__)
+        schema_index = obj.__class__._vobj__schema_index
 
-        for field in _walk_dict_attrs(obj, attrs, only, ignore):
-            val = field.get_obj_field(obj)
+        for _, _, dotname, value in fields:
+            slot = schema_index.get(dotname, None)
+            if slot is None:
+                if ('version' == dotname) and (obj.__class__._vobj__version_slot is not None):
+                    continue
+
+                raise AttributeError(f"Unrecognized attribute name '{dotname}' in dict")
+
+            _, _, _, getter, setter = schema[slot]
+            val = getter(obj)
             if isinstance(val, CustomValue):
-                val.from_dict(field.value)
+                val.from_dict(value)
             else:
-                field.set_obj_field(obj)
+                setter(obj, value)
 
         return migration_result
 
-    def to_json(self, obj=None, indent=None, only=[], ignore=[]):
+    def to_json(self, obj=None, indent=None, only=None, ignore=None):
         """
         Generate a JSON string containing all data from a VersionedObject instance
 
@@ -171,11 +254,11 @@ class Serializer(object):
         """
         return json.dumps(self.to_dict(obj, only, ignore), indent=indent)
 
-    def from_json(self, jsonstr, obj=None, validate=True, only=[], ignore=[]):
+    def from_json(self, jsonstr, obj=None, validate=True, only=None, ignore=None):
         """
         Populate instance attributes of a VersionedObject instance with object data from a JSON string.
 
-        :param str jsonstr: JSON string to load
+        :param jsonstr: JSON string to load, as str or UTF-8/16/32 encoded bytes
         :param obj: VersionedObject instance to populate. If unset, object passed to __init__\
             will be used instead
         :param bool validate: If false, pre-validation will be skipped for the input data.\
@@ -193,13 +276,13 @@ class Serializer(object):
         :rtype: MigrationResult
         """
         try:
-            d = json.loads(jsonstr)
-        except JSONDecodeError:
+            d = _json_loads(jsonstr)
+        except (JSONDecodeError, UnicodeDecodeError):
             raise LoadObjectError("JSON decode failure")
 
         return self.from_dict(d, obj, validate, only, ignore)
 
-    def to_file(self, filename, obj=None, indent=None, only=[], ignore=[]):
+    def to_file(self, filename, obj=None, indent=None, only=None, ignore=None):
         """
         Save VersionedObject instance data to a JSON file
 
@@ -210,10 +293,11 @@ class Serializer(object):
         :param list only: Whitelist of field names to serialize (cannot be used with blacklist)
         :param list ignore: Blacklist of field names to ignore (cannot be used with whitelist)
         """
+        attrs = self.to_dict(obj, only, ignore)
         with open(filename, 'w') as fh:
-            fh.write(self.to_json(obj, indent, only, ignore))
+            json.dump(attrs, fh, indent=indent)
 
-    def from_file(self, filename, obj=None, validate=True, only=[], ignore=[]):
+    def from_file(self, filename, obj=None, validate=True, only=None, ignore=None):
         """
         Populate instance attributes of a VersionedObject instance with object data from a JSON file.
 
@@ -234,8 +318,10 @@ class Serializer(object):
             None if no object migrations were required
         :rtype: MigrationResult
         """
-        with open(filename, 'r') as fh:
-            return self.from_json(fh.read(), obj, validate, only, ignore)
+        with open(filename, 'rb') as fh:
+            data = fh.read()
+
+        return self.from_json(data, obj, validate, only, ignore)
 
     def reset_to_defaults(self, obj=None):
         """
@@ -1,12 +1,37 @@
+import sys
+import inspect
+import keyword
+import unicodedata
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+from operator import attrgetter
+
 from versionedobj.exceptions import InvalidFilterError
 
 
+# Incremented whenever the layout of any VersionedObject class changes, so that
+# cached schemas can be lazily rebuilt (see _get_obj_schema)
+_schema_generation = 0
+
+# Types of field values that can be added to a dict as-is when serializing an object.
+# Values of any other type are passed to _convert_value
+_PLAIN_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Largest number of fields that a generated to_dict/from_dict function will be
+# created for. Compiling generated code costs far more than a single serialization,
+# so very large classes use the generic schema walk instead
+_CODEGEN_MAX_FIELDS = 2048
+
+
 class _ObjField(object):
     """
     Represents a dynamic view of a single field in a versioned object. Can be used
     to access the same field in either a VersionedConfig instance, or a dict
     """
 
+    __slots__ = ('parents', 'fieldname', 'value')
+
     obj_class = None
 
     def __init__(self, parents, fieldname, value):
@@ -46,7 +71,7 @@ class _ObjField(object):
         """
         Get the full object name, with sub-object names separated by dots
         """
-        return '.'.join(self.parents + [self.fieldname])
+        return '.'.join((*self.parents, self.fieldname))
 
     def get_obj_field(self, parent_obj):
         """
@@ -79,24 +104,6 @@ class _ObjField(object):
 
         return setattr(obj, self.fieldname, self.value)
 
-    def set_dict_field(self, parent_attrs):
-        """
-        Set the field on the provided dict
-
-        :param parent_attrs: dict to set field on
-        """
-        attrs = parent_attrs
-
-        if self.parents:
-            for pname in self.parents:
-                if pname not in attrs:
-                    attrs[pname] = {}
-
-                attrs = attrs[pname]
-
-        attrs[self.fieldname] = self.value
-        return parent_attrs
-
 
 def _iter_obj_attrs(obj):
     """
@@ -110,68 +117,656 @@ def _iter_obj_attrs(obj):
         yield n
 
 
-def _field_should_be_skipped(dotname, only, ignore):
+def _nested_obj_class(value):
+    """
+    Get the VersionedObject class for an attribute value that represents a nested
+    object (either a VersionedObject instance, or a VersionedObject class object)
+
+    :param value: attribute value to check
+
+    :return: VersionedObject class, or None if value is not a nested object
+    """
+    if isinstance(value, _ObjField.obj_class):
+        return value.__class__
+    elif inspect.isclass(value) and issubclass(value, _ObjField.obj_class):
+        return value
+
+    return None
+
+
+def _invalidate_obj_schemas():
+    """
+    Mark all cached object schemas as stale, forcing them to be rebuilt on next access
+    """
+    global _schema_generation
+    _schema_generation += 1
+
+
+def _make_field_setter(parents, fieldname):
+    """
+    Create a function that sets the value of a single field on a versioned object
+
+    :param tuple parents: names of parent objects of the field
+    :param str fieldname: name of the field
+
+    :return: function that takes an object instance and a value to set
+    """
+    if not parents:
+        def _setter(obj, value):
+            setattr(obj, fieldname, value)
+    else:
+        parent_getter = attrgetter('.'.join(parents))
+
+        def _setter(obj, value):
+            setattr(parent_getter(obj), fieldname, value)
+
+    return _setter
+
+
+def _build_obj_schema(obj_class):
+    """
+    Walk all fields (including nested fields) in a versioned object class, and
+    build a tuple describing each field as (parents, fieldname, dotname, getter, setter)
+
+    :param obj_class: Versioned object class to walk
+
+    :return: tuple of schema entries, a set of dotnames for all nested objects, and a\
+        tuple describing each object as (parents, class, attribute names)
+    """
+    schema = []
+    nested = set()
+    levels = []
+    cls_stack = deque([((), obj_class)])
+
+    while cls_stack:
+        parents, cls = cls_stack.popleft()
+
+        levels.append((parents, cls, frozenset(_iter_obj_attrs(cls))))
+
+        for n in _iter_obj_attrs(cls):
+            vobj_class = _nested_obj_class(cls.__dict__[n])
+
+            # Intern all names, so comparisons and dict lookups against them are cheap
+            fieldname = sys.intern(n)
+            dotname = sys.intern('.'.join(parents + (fieldname,)))
+
+            if vobj_class is not None:
+                nested.add(dotname)
+                cls_stack.append((parents + (fieldname,), vobj_class))
+            else:
+                schema.append((parents, fieldname, dotname, attrgetter(dotname),
+                               _make_field_setter(parents, fieldname)))
+
+    return tuple(schema), frozenset(nested), tuple(levels)
+
+
+def _get_obj_schema(obj_class):
     """
-    Check if a field should be skipped based on 'only' and 'ignore' parameters
+    Get the cached schema for a versioned object class, building it first if
+    it does not exist yet or is stale. The 'version' field is not included in
+    the schema, it is stored separately in the _vobj__version_slot class attribute,
+    and its position relative to the other fields in the _vobj__version_pos class attribute.
+
+    :param obj_class: Versioned object class to get schema for
 
-    :param list only: List of 'only' names
-    :param list ignore: List of 'ignore' names
+    :return: tuple of schema entries
     """
-    if only:
-        found = False
-        for n in only:
-            if dotname.startswith(n):
-                found = True
-                break
+    if obj_class.__dict__['_vobj__schema_gen'] != _schema_generation:
+        fields, nested, levels = _build_obj_schema(obj_class)
+
+        schema = []
+        version_entry = None
+        version_pos = None
+        for entry in fields:
+            if 'version' == entry[2]:
+                version_entry = entry
+                version_pos = len(schema)
+            else:
+                schema.append(entry)
+
+        schema = tuple(schema)
+        obj_class._vobj__fields = fields
+        obj_class._vobj__schema = schema
+        obj_class._vobj__version_slot = version_entry
+        obj_class._vobj__version_pos = version_pos
+        obj_class._vobj__schema_nested = nested
+        obj_class._vobj__schema_levels = levels
+        obj_class._vobj__schema_index = {e[2]: i for i, e in enumerate(schema)}
+        obj_class._vobj__setters = {e[2]: e[4] for e in fields}
+        obj_class._vobj__schema_gen = _schema_generation
 
-        return not found
+    return obj_class._vobj__schema
+
+
+def _get_obj_fields(obj_class):
+    """
+    Get the cached schema entries for all fields of a versioned object class,
+    including the 'version' field
+
+    :param obj_class: Versioned object class to get fields for
+
+    :return: tuple of schema entries
+    """
+    _get_obj_schema(obj_class)
+    return obj_class._vobj__fields
+
+
+@lru_cache(maxsize=128)
+def _filter_obj_schema_slots(obj_class, generation, only, ignore):
+    """
+    Get the indices of all schema entries for a versioned object class which are
+    selected by the 'only' and 'ignore' filters. Results are cached per class, schema
+    generation and filter combination.
+
+    :param obj_class: Versioned object class
+    :param int generation: Schema generation the schema for obj_class was built in
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
+
+    :return: tuple of schema indices
+    """
+    slots = []
+    for i, entry in enumerate(obj_class._vobj__schema):
+        dotname = entry[2]
+        if only and not dotname.startswith(only):
+            continue
+
+        if ignore and dotname.startswith(ignore):
+            continue
+
+        slots.append(i)
+
+    return tuple(slots)
+
+
+@lru_cache(maxsize=128)
+def _filter_obj_fields(obj_class, generation, only, ignore):
+    """
+    Get the schema entries (including the 'version' field) for a versioned object class
+    which are selected by the 'only' and 'ignore' filters, in the same order as
+    _vobj__fields. Also get the schema entries for fields which are parents of a name in
+    the filters, i.e. fields which would only be affected by the filters if they held a
+    nested object instance. Results are cached per class, schema generation and filter
+    combination.
+
+    :param obj_class: Versioned object class
+    :param int generation: Schema generation the schema for obj_class was built in
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
+
+    :return: tuple of (selected schema entries, parent schema entries)
+    """
+    schema = obj_class._vobj__schema
+    slots = _filter_obj_schema_slots(obj_class, generation, only, ignore)
+    entries = [schema[i] for i in slots]
 
-    for n in ignore:
-        if dotname.startswith(n):
-            return True
+    # Put the version field back in its original position, if it is not filtered out
+    version_entry = obj_class._vobj__version_slot
+    if version_entry is not None:
+        if not ((only and not 'version'.startswith(only)) or (ignore and 'version'.startswith(ignore))):
+            entries.insert(bisect_left(slots, obj_class._vobj__version_pos), version_entry)
+
+    names = only + ignore
+    parent_entries = []
+    for entry in schema:
+        prefix = entry[2] + '.'
+        if any(n.startswith(prefix) for n in names):
+            parent_entries.append(entry)
+
+    return tuple(entries), tuple(parent_entries)
+
+
+def _filtered_obj_schema_slots(obj_class, only, ignore):
+    """
+    Get the indices of all schema entries for a versioned object class which are
+    selected by the 'only' and 'ignore' filters.
+
+    :param obj_class: Versioned object class
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
+
+    :return: tuple of schema indices, or None if no filtering is required
+    """
+    if not (only or ignore):
+        return None
+
+    _get_obj_schema(obj_class)
+    return _filter_obj_schema_slots(obj_class, _schema_generation, only, ignore)
+
+
+def _normalize_filters(only, ignore):
+    """
+    Convert 'only' and 'ignore' parameters to tuples, suitable for passing to
+    str.startswith, and check that they are not both used at the same time
+
+    :param list only: List of 'only' names, or None
+    :param list ignore: List of 'ignore' names, or None
+
+    :raises versionedobj.exceptions.InvalidFilterError: if both 'only' and 'ignore' are provided.
+
+    :return: tuple of (only, ignore)
+    """
+    only = tuple(only) if only else ()
+    ignore = tuple(ignore) if ignore else ()
+
+    if only and ignore:
+        raise InvalidFilterError("Cannot use both 'only' and 'ignore'")
+
+    return only, ignore
+
+
+class _ObjLayoutChanged(Exception):
+    """
+    Raised while serializing an object instance using the schema for its class,
+    if the instance turns out to have different fields than its class
+    """
+    pass
 
 
-def _walk_obj_attrs(parent_obj, only=[], ignore=[]):
+def _obj_matches_schema(obj):
+    """
+    Check if an object instance, and all of its nested objects, have the same
+    attributes and nested object classes as the schema for its class
+
+    :param obj: Versioned object instance to check
+
+    :return: True if the instance matches the schema
+    """
+    # Object instances already checked, keyed by parents tuple
+    level_objs = {}
+
+    for parents, cls, names in obj.__class__._vobj__schema_levels:
+        level_obj = getattr(level_objs[parents[:-1]], parents[-1]) if parents else obj
+        if (type(level_obj) is not cls) or (level_obj.__dict__.keys() != names):
+            return False
+
+        level_objs[parents] = level_obj
+
+    return True
+
+
+def _convert_value(value):
+    """
+    Convert a field value that is not one of the _PLAIN_TYPES for adding to a dict
+
+    :param value: field value to convert
+
+    :raises _ObjLayoutChanged: if the value is a versioned object
+
+    :return: converted value
+    """
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    elif isinstance(value, _ObjField.obj_class):
+        # Nested object assigned to a field that is not a nested object in the class
+        raise _ObjLayoutChanged()
+
+    return value
+
+
+def _walk_obj_attrs(parent_obj, only=(), ignore=()):
     """
     Walk all fields (including nested fields) in a versioned object, and
     generate an _ObjField instance for each field
 
     :param parent_obj: Versioned object to walk
-    :param list only: List of 'only' names
-    :param list ignore: List of 'ignore' names
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
     """
-    obj_stack = [(None, [], parent_obj)]
+    obj_stack = deque([((), parent_obj)])
 
     while obj_stack:
-        fieldname, parents, obj = obj_stack.pop(0)
+        parents, obj = obj_stack.popleft()
 
         for n in _iter_obj_attrs(obj):
-            p = parents if fieldname is None else parents + [fieldname]
             value = obj.__dict__[n]
-            field = _ObjField(p, n, value)
+            field = _ObjField(parents, n, value)
 
             if isinstance(value, _ObjField.obj_class):
-                obj_stack.append((n, p, value))
+                obj_stack.append((parents + (n,), value))
             else:
-                if not _field_should_be_skipped(field.dot_name(), only, ignore):
-                    yield field
+                dotname = field.dot_name()
+                if only and not dotname.startswith(only):
+                    continue
+
+                if ignore and dotname.startswith(ignore):
+                    continue
+
+                yield field
 
 
-def _obj_to_dict(obj, only=[], ignore=[]):
+def _schema_to_dict(schema, obj, ret):
     """
-    Serialize an object instance to a dict
-    :param parent_obj: Versioned object to convert to dict
-    :param list only: List of 'only' names
-    :param list ignore: List of 'ignore' names
+    Serialize the fields described by a sequence of schema entries to a dict.
+    Replaced by the compiled version from versionedobj._walk_c, if available.
+
+    :param schema: sequence of schema entries for the fields to serialize
+    :param obj: Versioned object to convert to dict
+    :param dict ret: dict to add fields to
+
+    :return: object data as a dict
     """
-    if only and ignore:
-        raise InvalidFilterError("Cannot use both 'only' and 'ignore'")
+    # Nested dicts already created, keyed by the parents tuple of their fields
+    parent_dicts = {(): ret}
+
+    for parents, fieldname, _, getter, _ in schema:
+        value = getter(obj)
+        if type(value) not in _PLAIN_TYPES:
+            value = _convert_value(value)
+
+        attrs = parent_dicts.get(parents, None)
+        if attrs is None:
+            attrs = ret
+            for pname in parents:
+                if pname not in attrs:
+                    attrs[pname] = {}
+
+                attrs = attrs[pname]
+
+            parent_dicts[parents] = attrs
+
+        attrs[fieldname] = value
+
+    return ret
+
+
+try:
+    from versionedobj._walk_c import schema_to_dict as _schema_to_dict
+except ImportError:
+    pass
+
+
+def _is_codegen_name(name):
+    """
+    Check if a field name can be used verbatim as an attribute name in generated code.
+    Identifiers in source code are NFKC-normalized by the compiler, so names that
+    change under normalization would refer to a different attribute.
+    """
+    return (name.isidentifier() and not keyword.iskeyword(name) and
+            (unicodedata.normalize('NFKC', name) == name))
+
+
+def _compile_function(source, funcname, namespace):
+    """
+    Compile generated source code for a single function
+
+    :param str source: Python source code defining the function
+    :param str funcname: Name of the function defined in the source code
+    :param dict namespace: Globals for the generated function
 
+    :return: compiled function
+    """
+    exec(compile(source, f"<versionedobj {funcname}>", 'exec'), namespace)
+    return namespace[funcname]
+
+
+def _compile_to_dict(obj_class, entries, parent_entries=()):
+    """
+    Generate a function that serializes an instance of a versioned object class to a
+    dict, with one line of straight-line code per field, in the same order as
+    _schema_to_dict would add them. The generated function raises _ObjLayoutChanged
+    if the instance has different fields than its class.
+
+    :param obj_class: Versioned object class
+    :param entries: Schema entries for the fields to serialize
+    :param parent_entries: Schema entries for fields which must not hold a nested object\
+        instance, as returned by _filter_obj_fields
+
+    :return: generated function that takes an object instance and returns a dict,\
+        or None if the class has too many fields for generated code
+    """
+    if len(entries) > _CODEGEN_MAX_FIELDS:
+        return None
+
+    namespace = {'_plain': _PLAIN_TYPES, '_convert': _convert_value, '_changed': _ObjLayoutChanged,
+                 '_obj_class': _ObjField.obj_class}
+    lines = ["def _to_dict(obj):", "    try:"]
+
+    # Local variable names of instance dicts for nested objects, keyed by parents tuple.
+    # Fields are read from instance dicts directly, so that a field removed from an
+    # instance raises KeyError instead of reading the class attribute
+    inst_vars = {}
+
+    # Check that the instance and all nested object instances have the same number
+    # of attributes and the same classes as the schema
+    for num, (parents, cls, names) in enumerate(obj_class._vobj__schema_levels):
+        if parents:
+            namespace[f"_c{num}"] = cls
+            lines.append(f"        _o{num} = {inst_vars[parents[:-1]]}[{parents[-1]!r}]")
+            lines.append(f"        if type(_o{num}) is not _c{num}:")
+            lines.append("            raise _changed()")
+            lines.append(f"        _i{num} = _o{num}.__dict__")
+        else:
+            lines.append(f"        _i{num} = obj.__dict__")
+
+        lines.append(f"        if len(_i{num}) != {len(names)}:")
+        lines.append("            raise _changed()")
+        inst_vars[parents] = f"_i{num}"
+
+    for parents, fieldname, _, _, _ in parent_entries:
+        lines.append(f"        if isinstance({inst_vars[parents]}[{fieldname!r}], _obj_class):")
+        lines.append("            raise _changed()")
+
+    lines.append("        ret = {}")
+
+    # Local variable names of nested dicts already created, keyed by parents tuple
+    dict_vars = {(): 'ret'}
+
+    for parents, fieldname, _, _, _ in entries:
+        for i in range(1, len(parents) + 1):
+            if parents[:i] not in dict_vars:
+                num = len(dict_vars)
+                lines.append(f"        _d{num} = {dict_vars[parents[:i - 1]]}[{parents[i - 1]!r}] = {{}}")
+                dict_vars[parents[:i]] = f"_d{num}"
+
+        lines.append(f"        _v = {inst_vars[parents]}[{fieldname!r}]")
+        lines.append(f"        {dict_vars[parents]}[{fieldname!r}] = _v if type(_v) in _plain else _convert(_v)")
+
+    lines.append("    except KeyError:")
+    lines.append("        raise _changed() from None")
+    lines.append("    return ret")
+    return _compile_function('\n'.join(lines), '_to_dict', namespace)
+
+
+def _get_compiled_to_dict(obj_class):
+    """
+    Get the generated to_dict function for a versioned object class, generating it
+    first if it does not exist yet or the class layout has changed
+
+    :param obj_class: Versioned object class
+
+    :return: generated function, or None if the class cannot use generated code
+    """
+    schema = _get_obj_schema(obj_class)
+    cached = obj_class._vobj__to_dict
+    if (cached is None) or (cached[0] is not schema):
+        cached = (schema, _compile_to_dict(obj_class, obj_class._vobj__fields))
+        obj_class._vobj__to_dict = cached
+
+    return cached[1]
+
+
+@lru_cache(maxsize=128)
+def _compile_filtered_to_dict(obj_class, generation, only, ignore):
+    """
+    Get the generated to_dict function for a versioned object class, for a combination
+    of 'only' and 'ignore' filters. Results are cached per class, schema generation and
+    filter combination.
+
+    :param obj_class: Versioned object class
+    :param int generation: Schema generation the schema for obj_class was built in
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
+
+    :return: generated function, or None if the class cannot use generated code
+    """
+    entries, parent_entries = _filter_obj_fields(obj_class, generation, only, ignore)
+    return _compile_to_dict(obj_class, entries, parent_entries)
+
+
+def _compile_from_dict(obj_class, schema):
+    """
+    Generate a function that populates an instance of a versioned object class from a
+    dict, with one line of straight-line code per field. The generated function only
+    handles dicts containing exactly the fields of the object (plus an optional 'version'
+    field, if the class has one), which it checks before setting any fields. For any other dict it
+    returns False without modifying the object, so that the generic walk can produce
+    the appropriate error.
+
+    :param obj_class: Versioned object class
+    :param schema: Schema for obj_class, as returned by _get_obj_schema
+
+    :return: generated function that takes an object instance and a dict, and returns\
+        True if the object was populated, or None if the class layout cannot be\
+        expressed in generated code
+    """
+    if len(schema) > _CODEGEN_MAX_FIELDS:
+        return None
+
+    # Expected keys for each nested dict, keyed by parents tuple
+    keys = {(): set()}
+    for parents, fieldname, _, _, _ in schema:
+        if not (_is_codegen_name(fieldname) and all(_is_codegen_name(n) for n in parents)):
+            return None
+
+        names = parents + (fieldname,)
+        for i in range(len(parents) + 1):
+            keys.setdefault(names[:i], set()).add(names[i])
+
+    # Imported here, since versionedobj.object imports this module
+    from versionedobj.object import CustomValue
+
+    namespace = {'CustomValue': CustomValue}
+    check_lines = ["def _from_dict(obj, attrs):",
+                   "    if type(attrs) is not dict:",
+                   "        return False",
+                   "    _keys = attrs.keys()",
+                   "    if not (_keys == _k0 or _keys == _k0v):",
+                   "        return False"]
+    set_lines = []
+    namespace['_k0'] = frozenset(keys[()])
+    if obj_class._vobj__version_slot is None:
+        namespace['_k0v'] = namespace['_k0']
+    else:
+        namespace['_k0v'] = frozenset(keys[()] | {'version'})
+
+    # Local variable names of nested dicts/objects already accessed, keyed by parents tuple
+    dict_vars = {(): 'attrs'}
+    obj_vars = {(): 'obj'}
+
+    for parents, fieldname, _, _, _ in schema:
+        for i in range(1, len(parents) + 1):
+            if parents[:i] not in dict_vars:
+                num = len(dict_vars)
+                pname = parents[i - 1]
+                namespace[f"_k{num}"] = frozenset(keys[parents[:i]])
+                check_lines.append(f"    _a{num} = {dict_vars[parents[:i - 1]]}[{pname!r}]")
+                check_lines.append(f"    if type(_a{num}) is not dict or _a{num}.keys() != _k{num}:")
+                check_lines.append("        return False")
+                set_lines.append(f"    _o{num} = {obj_vars[parents[:i - 1]]}.{pname}")
+                dict_vars[parents[:i]] = f"_a{num}"
+                obj_vars[parents[:i]] = f"_o{num}"
+
+        value = f"{dict_vars[parents]}[{fieldname!r}]"
+        set_lines.append(f"    _v = {obj_vars[parents]}.{fieldname}")
+        set_lines.append("    if isinstance(_v, CustomValue):")
+        set_lines.append(f"        _v.from_dict({value})")
+        set_lines.append("    else:")
+        set_lines.append(f"        {obj_vars[parents]}.{fieldname} = {value}")
+
+    set_lines.append("    return True")
+    return _compile_function('\n'.join(check_lines + set_lines), '_from_dict', namespace)
+
+
+def _get_compiled_from_dict(obj_class):
+    """
+    Get the generated from_dict function for a versioned object class, generating it
+    first if it does not exist yet or the class layout has changed
+
+    :param obj_class: Versioned object class
+
+    :return: generated function, or None if the class cannot use generated code
+    """
+    schema = _get_obj_schema(obj_class)
+    cached = obj_class._vobj__from_dict
+    if (cached is None) or (cached[0] is not schema):
+        cached = (schema, _compile_from_dict(obj_class, schema))
+        obj_class._vobj__from_dict = cached
+
+    return cached[1]
+
+
+def _instance_to_dict(obj, only=(), ignore=()):
+    """
+    Serialize an object instance to a dict, by walking the attributes of the instance
+    instead of using the schema for its class
+    :param parent_obj: Versioned object to convert to dict
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
+    """
     ret = {}
     for field in _walk_obj_attrs(obj, only, ignore):
-        if hasattr(field.value, 'to_dict'):
-            field.value = field.value.to_dict()
+        value = field.value
+        if hasattr(value, 'to_dict'):
+            value = value.to_dict()
+
+        attrs = ret
+        for pname in field.parents:
+            if pname not in attrs:
+                attrs[pname] = {}
+
+            attrs = attrs[pname]
 
-        ret = field.set_dict_field(ret)
+        attrs[field.fieldname] = value
 
     return ret
+
+
+def _obj_to_dict(obj, only=(), ignore=()):
+    """
+    Serialize an object instance to a dict
+    :param parent_obj: Versioned object to convert to dict
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
+    """
+    try:
+        return _schema_obj_to_dict(obj, only, ignore)
+    except _ObjLayoutChanged:
+        # Fields have been added to or removed from this instance, or one of its nested
+        # objects, so the schema for its class cannot be used
+        return _instance_to_dict(obj, only, ignore)
+
+
+def _schema_obj_to_dict(obj, only, ignore):
+    """
+    Serialize an object instance to a dict, using the schema for its class
+    :param parent_obj: Versioned object to convert to dict
+    :param tuple only: Tuple of 'only' names
+    :param tuple ignore: Tuple of 'ignore' names
+
+    :raises _ObjLayoutChanged: if the object instance has different fields than its class
+    """
+    obj_class = obj.__class__
+    _get_obj_schema(obj_class)
+
+    if only or ignore:
+        to_dict = _compile_filtered_to_dict(obj_class, _schema_generation, only, ignore)
+    else:
+        to_dict = _get_compiled_to_dict(obj_class)
+
+    if to_dict is not None:
+        return to_dict(obj)
+
+    if not _obj_matches_schema(obj):
+        raise _ObjLayoutChanged()
+
+    if only or ignore:
+        entries, parent_entries = _filter_obj_fields(obj_class, _schema_generation, only, ignore)
+        for entry in parent_entries:
+            if isinstance(entry[3](obj), _ObjField.obj_class):
+                # Filters may select fields of a nested object assigned to this instance
+                raise _ObjLayoutChanged()
+    else:
+        entries = obj_class._vobj__fields
+
+    return _schema_to_dict(entries, obj, {})